@@ -4,10 +4,19 @@ from typing import Optional, Dict, Any
 import paramiko
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.types import TextContent
+import codecs
 import io
 import logging
 import json
+import queue
+import re
+import selectors
+import socket
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from threading import Lock
 from pathlib import Path
 
@@ -130,29 +139,98 @@ class ExecLogManager:
         except Exception as e:
             logger.error(f"保存执行日志失败: {e}")
 
+# 私钥解析缓存：from_private_key_file 每次都要读文件并做解密/反序列化，
+# 池中连接重建时没必要重复这笔开销。按 (路径, mtime) 缓存，文件更新后失效。
+_private_key_cache: Dict[tuple, paramiko.PKey] = {}
+_private_key_cache_lock = Lock()
+
+
+def _parse_private_key(key_path: str) -> paramiko.PKey:
+    """解析私钥文件，支持 RSA/Ed25519/ECDSA 等常见密钥类型"""
+    if hasattr(paramiko.PKey, 'from_path'):
+        # paramiko >= 3.2 可以自动识别密钥类型
+        return paramiko.PKey.from_path(key_path)
+    # 旧版本按类型依次尝试
+    last_error = None
+    for key_cls in (paramiko.RSAKey, paramiko.Ed25519Key, paramiko.ECDSAKey):
+        try:
+            return key_cls.from_private_key_file(key_path)
+        except paramiko.SSHException as e:
+            last_error = e
+    raise last_error
+
+
+def _load_private_key(key_path: str) -> paramiko.PKey:
+    """加载私钥文件，结果按 (路径, 修改时间) 缓存"""
+    cache_key = (key_path, os.path.getmtime(key_path))
+    with _private_key_cache_lock:
+        key = _private_key_cache.get(cache_key)
+        if key is None:
+            key = _parse_private_key(key_path)
+            _private_key_cache[cache_key] = key
+    return key
+
+
+@dataclass(frozen=True)
+class SSHConfig:
+    """不可变的SSH连接配置
+
+    环境变量在模块导入时解析一次并固化在这里，之后每次建立连接
+    直接复用同一份配置，不再重复做字符串转换和校验。
+    """
+    host: str
+    username: str
+    port: int = 22
+    password: Optional[str] = None
+    key_path: Optional[str] = None
+
+
 class SSHConnection:
     """单个SSH连接配置类"""
-    
+
     def __init__(self, name: str, config: Dict[str, Any]):
         """
         初始化SSH连接配置
-        
+
         Args:
             name: 连接名称
             config: 连接配置字典，包含 host, username, password, key_path, port 等
         """
         self.name = name
-        self.ssh_host = config.get('host')
-        self.ssh_port = int(config.get('port', 22))
-        self.ssh_username = config.get('username')
-        self.ssh_password = config.get('password')
-        self.ssh_key_path = config.get('key_path')
-        
-        if not self.ssh_host or not self.ssh_username:
+        self.config = SSHConfig(
+            host=config.get('host'),
+            username=config.get('username'),
+            port=int(config.get('port', 22)),
+            password=config.get('password'),
+            key_path=config.get('key_path'),
+        )
+
+        if not self.config.host or not self.config.username:
             raise ValueError(f"连接 '{name}' 必须设置 host 和 username")
-        
-        if not self.ssh_password and not self.ssh_key_path:
+
+        if not self.config.password and not self.config.key_path:
             raise ValueError(f"连接 '{name}' 必须设置 password 或 key_path")
+
+        # 兼容旧属性名，内部统一读取 self.config
+        self.ssh_host = self.config.host
+        self.ssh_port = self.config.port
+        self.ssh_username = self.config.username
+        self.ssh_password = self.config.password
+        self.ssh_key_path = self.config.key_path
+
+        # 连接参数只组装一次，重连时直接复用（认证凭据在connect时按需补充）
+        self._connect_kwargs = {
+            'hostname': self.config.host,
+            'port': self.config.port,
+            'username': self.config.username,
+            'timeout': 10,
+            # 凭据已明确给出，跳过本地密钥扫描/agent/GSSAPI协商，
+            # 减少握手阶段的认证尝试轮次
+            'look_for_keys': False,
+            'allow_agent': False,
+            'gss_auth': False,
+            'gss_kex': False,
+        }
     
     def create_client(self) -> paramiko.SSHClient:
         """创建并配置SSH客户端"""
@@ -163,29 +241,40 @@ class SSHConnection:
     def connect(self, client: paramiko.SSHClient) -> None:
         """建立SSH连接"""
         try:
+            kwargs = dict(self._connect_kwargs)
             if self.ssh_key_path and os.path.exists(self.ssh_key_path):
-                # 使用密钥认证
-                key = paramiko.RSAKey.from_private_key_file(self.ssh_key_path)
-                client.connect(
-                    hostname=self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    pkey=key,
-                    timeout=10
-                )
+                # 使用密钥认证（私钥解析结果有缓存）
+                kwargs['pkey'] = _load_private_key(self.ssh_key_path)
             else:
                 # 使用密码认证
-                client.connect(
-                    hostname=self.ssh_host,
-                    port=self.ssh_port,
-                    username=self.ssh_username,
-                    password=self.ssh_password,
-                    timeout=10
-                )
+                kwargs['password'] = self.ssh_password
+            client.connect(**kwargs)
+            # 启用保活机制，避免池中的空闲连接被防火墙/NAT静默断开
+            self._enable_keepalive(client)
             logger.info(f"成功连接到 {self.ssh_host}:{self.ssh_port} (连接名: {self.name})")
         except Exception as e:
             logger.error(f"SSH连接失败 (连接名: {self.name}): {e}")
             raise
+
+    def _enable_keepalive(self, client: paramiko.SSHClient) -> None:
+        """在SSH协议层和TCP层同时启用保活心跳
+
+        池化后空闲的连接可能被防火墙/NAT静默丢弃，下次使用时才报错并
+        付出一次完整的重新握手。周期性的心跳包成本远低于重新握手。
+        """
+        try:
+            transport = client.get_transport()
+            if transport is None:
+                return
+            # SSH协议层心跳（global request）
+            interval = int(os.getenv('SSH_KEEPALIVE_INTERVAL', '30'))
+            transport.set_keepalive(interval)
+            # TCP层保活
+            if transport.sock is not None:
+                transport.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except Exception as e:
+            # 保活只是优化手段，失败不应阻止连接使用
+            logger.warning(f"启用保活失败 (连接名: {self.name}): {e}")
     
     def get_info(self) -> Dict[str, Any]:
         """获取连接信息（不包含敏感数据）"""
@@ -321,9 +410,457 @@ class SSHConnectionManager:
         return self.default_connection_name
 
 
+class SSHSession:
+    """基于持久交互式shell的命令执行会话
+
+    exec_command 每次都要新开一个SSH通道（session request）并等待其关闭，
+    在延迟敏感的工作负载下通道建立本身就是主要开销。SSHSession 在一条
+    池化连接上只调用一次 invoke_shell()，之后的命令都写入同一个通道，
+    通过哨兵标记切分输出并解析退出码。
+
+    注意：交互式shell下 stderr 会与 stdout 合并输出。
+    """
+
+    # 哨兵标记，用于在shell输出流中定位命令结束位置和退出码
+    _END_MARKER = "__SSH_MCP_END__"
+
+    # 终端转义序列（CSI颜色/bracketed paste、OSC窗口标题、两字符转义）。
+    # 命令在PTY下运行时 isatty() 为真，ls/grep 等会输出颜色码，
+    # readline 的提示符周期也会发出 bracketed paste 开关序列
+    _ANSI_ESCAPE_RE = re.compile(
+        r'\x1b(?:\[[0-9;?]*[ -/]*[@-~]'
+        r'|\][^\x07\x1b]*(?:\x07|\x1b\\)'
+        r'|[@-Z\\-_])'
+    )
+
+    def __init__(self, client: paramiko.SSHClient):
+        self.client = client
+        self.channel = client.invoke_shell(width=500)
+        self.channel.settimeout(10)
+        # 关闭回显并清空提示符，保证后续输出只包含命令本身的输出
+        self._initialize_shell()
+
+    def _initialize_shell(self):
+        """初始化shell：关闭回显、清空提示符，并排空登录横幅
+
+        注意哨兵必须用 printf '...%s\\n' 0 的形式：这行命令发出时回显
+        还未关闭，PTY会原样回显命令文本。回显里只有字面量 %s，匹配不了
+        哨兵正则的 (\\d+)，真正的 printf 输出才会结束这次排空。
+        """
+        init_cmd = (
+            "stty -echo 2>/dev/null; "
+            "bind 'set enable-bracketed-paste off' 2>/dev/null; "
+            "export PS1='' PS2='' PROMPT_COMMAND=''; "
+            f"printf '\\n{self._END_MARKER}%s\\n' 0\n"
+        )
+        self.channel.send(init_cmd)
+        # 读取并丢弃登录横幅、回显等内容，直到哨兵出现
+        self._read_until_marker(deadline=time.time() + 10)
+
+    def is_active(self) -> bool:
+        """判断会话通道是否仍然可用"""
+        transport = self.client.get_transport()
+        return (
+            transport is not None
+            and transport.is_active()
+            and not self.channel.closed
+        )
+
+    def _read_until_marker(self, deadline: float) -> tuple:
+        """读取通道输出直到出现哨兵标记，返回 (标记前的输出, 退出码)"""
+        buffer = ""
+        pattern = re.compile(re.escape(self._END_MARKER) + r'(\d+)')
+        # 增量解码器在块边界处保留不完整的多字节序列，
+        # 避免按块decode把UTF-8字符截成替换符
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise socket.timeout("等待命令输出超时")
+            self.channel.settimeout(remaining)
+            data = self.channel.recv(32768)
+            if not data:
+                raise paramiko.SSHException("shell通道已关闭")
+            buffer += decoder.decode(data)
+            match = pattern.search(buffer)
+            if match:
+                output = buffer[:match.start()]
+                return output, int(match.group(1))
+
+    def _flush_pending(self):
+        """丢弃上一条命令哨兵之后残留的提示符/转义输出"""
+        try:
+            while self.channel.recv_ready():
+                self.channel.recv(32768)
+        except Exception:
+            pass
+
+    def run(self, command: str, timeout: int = 30) -> tuple:
+        """
+        在共享shell中执行命令
+
+        哨兵printf作为独立的一行发送，命令末尾的 # 注释不会吞掉它。
+        局限：需要额外输入才能完整的命令（未闭合的引号、heredoc、
+        交互式程序）会让shell等待输入直到超时，此类命令请使用
+        execute_interactive_command。
+
+        Args:
+            command: 要执行的shell命令
+            timeout: 命令执行超时时间（秒）
+
+        Returns:
+            (output, exit_code) 元组，output 为合并后的 stdout/stderr
+        """
+        self._flush_pending()
+        # printf 前置换行保证命令输出不以换行结尾时哨兵仍独占一行
+        self.channel.send(f"{command}\nprintf '\\n{self._END_MARKER}%s\\n' $?\n")
+        output, exit_code = self._read_until_marker(deadline=time.time() + timeout)
+        # 清理PTY带来的终端转义序列和\r，并去掉哨兵printf补上的换行
+        output = self._ANSI_ESCAPE_RE.sub('', output)
+        output = output.replace('\r\n', '\n')
+        if output.endswith('\n'):
+            output = output[:-1]
+        return output, exit_code
+
+    def close(self):
+        """关闭shell通道"""
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+
+
+def _get_shell_session(client: paramiko.SSHClient) -> SSHSession:
+    """获取（或创建）绑定在池化客户端上的共享shell会话"""
+    session = getattr(client, '_ssh_mcp_session', None)
+    if session is None or not session.is_active():
+        session = SSHSession(client)
+        client._ssh_mcp_session = session
+    return session
+
+
+class SSHConnectionPool:
+    """SSH连接池，按连接名称复用已建立的SSH客户端
+
+    每次工具调用都重新建立连接需要完整的TCP+SSH握手（密钥交换、认证），
+    这是工具调用延迟的主要来源。连接池在调用之间保留活跃的客户端，
+    后续调用直接复用，失效的连接会被自动丢弃并重建。
+    """
+
+    def __init__(self, manager: SSHConnectionManager, max_size: int = 4,
+                 max_concurrent: int = 8):
+        """
+        初始化连接池
+
+        Args:
+            manager: SSH连接管理器
+            max_size: 每个连接名称最多保留的空闲客户端数量
+            max_concurrent: 每个连接名称允许的最大并发借用数，
+                            用于不超过目标sshd的 MaxStartups/MaxSessions 限制
+        """
+        self.manager = manager
+        self.max_size = max_size
+        self.max_concurrent = max_concurrent
+        self._pools: Dict[str, queue.Queue] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = Lock()
+
+    def _get_pool(self, name: str) -> queue.Queue:
+        """获取指定连接名称的空闲客户端队列（不存在时创建）"""
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = queue.Queue(maxsize=self.max_size)
+            return self._pools[name]
+
+    def _get_semaphore(self, name: str) -> threading.BoundedSemaphore:
+        """获取指定连接名称的并发信号量（不存在时创建）"""
+        with self._lock:
+            if name not in self._semaphores:
+                self._semaphores[name] = threading.BoundedSemaphore(self.max_concurrent)
+            return self._semaphores[name]
+
+    @contextmanager
+    def borrow(self, connection_name: Optional[str] = None):
+        """
+        借用一个已连接的SSH客户端，使用完毕后归还到池中
+
+        从池中取出客户端时会先验证底层Transport是否仍然活跃，
+        失效的客户端会被关闭并重新建立连接。调用方出现异常时
+        客户端会被丢弃而不是归还，避免把状态不明的连接留在池中。
+
+        Args:
+            connection_name: SSH连接名称，如果为 None 则使用默认连接
+
+        Yields:
+            (SSHConnection, paramiko.SSHClient) 元组
+        """
+        connection = self.manager.get_connection(connection_name)
+        pool = self._get_pool(connection.name)
+
+        # 限制同一主机的并发借用数，避免瞬时并发的握手/会话
+        # 超过目标sshd的 MaxStartups/MaxSessions 而被直接拒绝
+        semaphore = self._get_semaphore(connection.name)
+        with semaphore:
+            yield from self._borrow_locked(connection, pool)
+
+    def _borrow_locked(self, connection: SSHConnection, pool: queue.Queue):
+        """borrow() 的主体，在并发信号量保护下执行"""
+        client = None
+        try:
+            client = pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        # 验证池中取出的连接是否仍然可用，失效则丢弃重建
+        if client is not None:
+            transport = client.get_transport()
+            if transport is None or not transport.is_active():
+                logger.info(f"池中连接已失效，重新建立连接 [{connection.name}]")
+                try:
+                    client.close()
+                except Exception:
+                    pass
+                client = None
+
+        if client is None:
+            client = connection.create_client()
+            connection.connect(client)
+
+        try:
+            yield connection, client
+        except BaseException:
+            # 异常后连接状态不明，直接丢弃
+            try:
+                client.close()
+            except Exception:
+                pass
+            raise
+        else:
+            try:
+                pool.put_nowait(client)
+            except queue.Full:
+                client.close()
+
+    def close_all(self):
+        """关闭池中所有空闲连接"""
+        with self._lock:
+            for pool in self._pools.values():
+                while True:
+                    try:
+                        client = pool.get_nowait()
+                    except queue.Empty:
+                        break
+                    try:
+                        client.close()
+                    except Exception:
+                        pass
+
+
 # 全局SSH连接管理器
 ssh_manager = SSHConnectionManager()
 
+# 全局SSH连接池
+ssh_pool = SSHConnectionPool(
+    ssh_manager,
+    max_size=int(os.getenv('SSH_POOL_SIZE', '4')),
+    max_concurrent=int(os.getenv('SSH_MAX_CONCURRENT', '8')),
+)
+
+# SFTP传输调优参数：更大的流控窗口允许更多在途数据包，
+# 32KB的数据包大小是多数sshd实现不分片的上限
+SFTP_WINDOW_SIZE = 2 ** 22
+SFTP_MAX_PACKET_SIZE = 2 ** 15
+SFTP_CHUNK_SIZE = 2 ** 15
+
+
+class _TTLCache:
+    """进程内的LRU结果缓存，条目带独立的过期时间"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """返回未过期的缓存值，未命中或已过期返回 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.time() > expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: Any, ttl: float) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# 命令结果缓存：只对调用方显式传入 cache_ttl 的命令生效，
+# 把重复的只读探测（uname、whoami等）从一次SSH往返变成字典查找
+_command_result_cache = _TTLCache(maxsize=256)
+
+
+# 失败结果模板：各except分支只覆盖差异字段（error/connection等），
+# 不再在每个分支重复构造相同的字典字面量
+_COMMAND_FAILURE_TEMPLATE = {
+    "success": False,
+    "exit_code": -1,
+    "stdout": "",
+    "stderr": "",
+    "error": None,
+    "connection": None,
+}
+
+_UPLOAD_FAILURE_TEMPLATE = {
+    "success": False,
+    "local_path": None,
+    "remote_path": None,
+    "file_size": 0,
+    "connection": None,
+    "error": None,
+}
+
+_DOWNLOAD_FAILURE_TEMPLATE = {
+    "success": False,
+    "remote_path": None,
+    "local_path": None,
+    "file_size": 0,
+    "connection": None,
+    "error": None,
+}
+
+_LISTING_FAILURE_TEMPLATE = {
+    "success": False,
+    "path": None,
+    "total_count": 0,
+    "connection": None,
+    "error": None,
+}
+
+
+def _command_failure(error_msg: str, connection_name: Optional[str]) -> Dict[str, Any]:
+    """基于模板构造命令执行失败的返回结果"""
+    return {**_COMMAND_FAILURE_TEMPLATE, "error": error_msg, "connection": connection_name}
+
+
+def _upload_failure(local_path: str, remote_path: str, connection_name: Optional[str], error_msg: str) -> Dict[str, Any]:
+    """基于模板构造文件上传失败的返回结果"""
+    return {**_UPLOAD_FAILURE_TEMPLATE, "local_path": local_path, "remote_path": remote_path,
+            "connection": connection_name, "error": error_msg}
+
+
+def _download_failure(remote_path: str, local_path: str, connection_name: Optional[str], error_msg: str) -> Dict[str, Any]:
+    """基于模板构造文件下载失败的返回结果"""
+    return {**_DOWNLOAD_FAILURE_TEMPLATE, "remote_path": remote_path, "local_path": local_path,
+            "connection": connection_name, "error": error_msg}
+
+
+def _listing_failure(remote_path: str, connection_name: Optional[str], error_msg: str) -> Dict[str, Any]:
+    """基于模板构造目录列表失败的返回结果"""
+    # files 每次新建，避免各结果共享同一个可变列表
+    return {**_LISTING_FAILURE_TEMPLATE, "path": remote_path, "files": [],
+            "connection": connection_name, "error": error_msg}
+
+
+def _wait_for_channel(channel: paramiko.Channel, timeout: float) -> None:
+    """等待通道变为可读或超时
+
+    用系统poller（Linux上为epoll）阻塞在通道的fileno上，数据一到达
+    立即唤醒，替代固定间隔的 sleep 轮询（空转且每轮平添最多10ms延迟）。
+    """
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(channel, selectors.EVENT_READ)
+            selector.select(timeout)
+    except (OSError, ValueError):
+        # fileno不可用时退回到短暂休眠
+        time.sleep(0.01)
+
+
+def _drain_exec_channel(channel: paramiko.Channel, timeout: Optional[float] = None) -> tuple:
+    """并发排空exec通道的stdout/stderr，返回 (退出码, stdout文本, stderr文本)
+
+    先 recv_exit_status() 再依次 read() 的串行方式在命令输出超过通道
+    窗口时会互相阻塞：远端等本地腾出窗口，本地等远端的退出状态。
+    这里交替读取两个流直到退出状态就绪，两侧都不会停滞。
+    输出在读取过程中增量解码为文本，块边界处的不完整多字节序列由
+    解码器暂存，避免结束后再对整个缓冲做一次完整的decode扫描。
+    """
+    stdout_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    stderr_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    stdout_parts = []
+    stderr_parts = []
+    deadline = time.time() + timeout if timeout else None
+
+    while True:
+        drained = False
+        while channel.recv_ready():
+            stdout_parts.append(stdout_decoder.decode(channel.recv(32768)))
+            drained = True
+        while channel.recv_stderr_ready():
+            stderr_parts.append(stderr_decoder.decode(channel.recv_stderr(32768)))
+            drained = True
+        if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+            break
+        if not drained:
+            if deadline is not None and time.time() > deadline:
+                raise socket.timeout("等待命令输出超时")
+            _wait_for_channel(channel, 0.1)
+
+    # 退出状态就绪后缓冲区可能仍有残留数据
+    while channel.recv_ready():
+        stdout_parts.append(stdout_decoder.decode(channel.recv(32768)))
+    while channel.recv_stderr_ready():
+        stderr_parts.append(stderr_decoder.decode(channel.recv_stderr(32768)))
+
+    # 刷出解码器中暂存的尾部字节
+    stdout_parts.append(stdout_decoder.decode(b'', final=True))
+    stderr_parts.append(stderr_decoder.decode(b'', final=True))
+
+    exit_code = channel.recv_exit_status()
+    return exit_code, ''.join(stdout_parts), ''.join(stderr_parts)
+
+
+def _ensure_remote_dir(sftp: paramiko.SFTPClient, remote_dir: str) -> None:
+    """确保远程目录存在，仅在缺失时通过SFTP逐级创建
+
+    之前通过 exec_command('mkdir -p ...') 实现，每次上传都要额外开一个
+    SSH通道并等待命令退出；目录通常已经存在，一次 sftp.stat 就能确认。
+    """
+    if not remote_dir or remote_dir == '/':
+        return
+    try:
+        sftp.stat(remote_dir)
+        return
+    except FileNotFoundError:
+        pass
+    # 父目录可能同样不存在，自底向上递归创建
+    parent = os.path.dirname(remote_dir.rstrip('/'))
+    if parent and parent != remote_dir:
+        _ensure_remote_dir(sftp, parent)
+    try:
+        sftp.mkdir(remote_dir)
+    except IOError:
+        # 目录可能已被并发创建，忽略
+        pass
+
+
+def _open_tuned_sftp(client: paramiko.SSHClient) -> paramiko.SFTPClient:
+    """在已连接的客户端上创建调优过窗口/包大小的SFTP会话"""
+    return paramiko.SFTPClient.from_transport(
+        client.get_transport(),
+        window_size=SFTP_WINDOW_SIZE,
+        max_packet_size=SFTP_MAX_PACKET_SIZE,
+    )
+
 # 全局日志管理器
 log_manager = ExecLogManager()
 
@@ -345,145 +882,111 @@ def list_ssh_connections() -> Dict[str, Any]:
         "total_count": len(connections)
     }
 
-@mcp.tool()
-def execute_command(command: str, timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
-    """
-    在远程服务器上执行shell命令
-    
-    Args:
-        command: 要执行的shell命令
-        timeout: 命令执行超时时间（秒），默认30秒
-        connection_name: SSH连接名称，如果不指定则使用默认连接
-    
-    Returns:
-        Dict包含执行结果：
-        - success: 是否成功执行
-        - exit_code: 命令退出码
-        - stdout: 标准输出
-        - stderr: 标准错误输出
-        - error: 错误信息（如果有）
-        - connection: 使用的连接名称
-    """
-    client = None
+def _execute_command_sync(command: str, timeout: int = 30, connection_name: Optional[str] = None, cache_ttl: int = 0) -> Dict[str, Any]:
+    """execute_command 的同步实现，在工作线程中运行"""
     try:
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 执行命令
-        stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-        
-        # 等待命令完成并获取结果
-        exit_code = stdout.channel.recv_exit_status()
-        stdout_data = stdout.read().decode('utf-8', errors='replace')
-        stderr_data = stderr.read().decode('utf-8', errors='replace')
-        
-        result = {
-            "success": exit_code == 0,
-            "exit_code": exit_code,
-            "stdout": stdout_data,
-            "stderr": stderr_data,
-            "error": None,
-            "connection": connection.name
-        }
-        
+        # 调用方声明命令可缓存时，先查缓存，命中则跳过SSH往返。
+        # 按连接名称而不是主机做键：同一主机可能配置多个用户/端口
+        # 不同的命名连接，它们的命令结果不可互换
+        if cache_ttl > 0:
+            connection = ssh_manager.get_connection(connection_name)
+            cache_key = (connection.name, command)
+            cached = _command_result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"命令结果缓存命中 [{connection.name}]: '{command}'")
+                return dict(cached)
+
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            # 通过共享shell会话执行命令，避免每条命令都新开SSH通道
+            session = _get_shell_session(client)
+            stdout_data, exit_code = session.run(command, timeout=timeout)
+
+            result = {
+                "success": exit_code == 0,
+                "exit_code": exit_code,
+                "stdout": stdout_data,
+                "stderr": "",
+                "error": None,
+                "connection": connection.name
+            }
+
+        # 只缓存成功结果，避免把瞬时故障固化到TTL结束
+        if cache_ttl > 0 and result["success"]:
+            _command_result_cache.put((connection.name, command), dict(result), cache_ttl)
+
         logger.info(f"命令执行完成 [{connection.name}]: '{command}', 退出码: {exit_code}")
         log_manager.save_execution_log(command, result)
         return result
-        
+
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
     except paramiko.AuthenticationException:
         error_msg = "SSH认证失败，请检查用户名和密码/密钥"
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
     except paramiko.SSHException as e:
         error_msg = f"SSH连接错误: {str(e)}"
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
     except Exception as e:
         error_msg = f"命令执行失败: {str(e)}"
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
-    finally:
-        if client:
-            client.close()
 
 @mcp.tool()
-def check_ssh_connection(connection_name: Optional[str] = None) -> Dict[str, Any]:
+async def execute_command(command: str, timeout: int = 30, connection_name: Optional[str] = None, cache_ttl: int = 0) -> Dict[str, Any]:
     """
-    检查SSH连接状态
-    
+    在远程服务器上执行shell命令
+
     Args:
+        command: 要执行的shell命令
+        timeout: 命令执行超时时间（秒），默认30秒
         connection_name: SSH连接名称，如果不指定则使用默认连接
-    
+        cache_ttl: 结果缓存秒数，默认0（不缓存）。仅适用于幂等的
+                   只读命令（如 uname、whoami），TTL内的重复调用
+                   直接返回缓存结果而不再执行SSH往返
+
     Returns:
-        Dict包含连接状态信息：
-        - connected: 是否能够连接
-        - connection_name: 连接名称
-        - host: 目标主机
-        - port: 目标端口
-        - username: 用户名
+        Dict包含执行结果：
+        - success: 是否成功执行
+        - exit_code: 命令退出码
+        - stdout: 标准输出（共享shell模式下stderr会合并到这里）
+        - stderr: 标准错误输出（共享shell模式下恒为空字符串）
         - error: 错误信息（如果有）
+        - connection: 使用的连接名称
     """
-    client = None
+    # paramiko是阻塞IO，放到工作线程执行以免阻塞事件循环
+    return await asyncio.to_thread(_execute_command_sync, command, timeout, connection_name, cache_ttl)
+
+def _check_ssh_connection_sync(connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """check_ssh_connection 的同步实现，在工作线程中运行"""
     try:
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 执行一个简单的命令来测试连接
-        stdin, stdout, stderr = client.exec_command('echo "连接测试成功"', timeout=5)
-        output = stdout.read().decode('utf-8', errors='replace').strip()
-        
-        return {
-            "connected": True,
-            "connection_name": connection.name,
-            "host": connection.ssh_host,
-            "port": connection.ssh_port,
-            "username": connection.ssh_username,
-            "test_output": output,
-            "error": None
-        }
-        
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            # 执行一个简单的命令来测试连接
+            stdin, stdout, stderr = client.exec_command('echo "连接测试成功"', timeout=5)
+            _, output, _ = _drain_exec_channel(stdout.channel, timeout=5)
+            output = output.strip()
+
+            return {
+                "connected": True,
+                "connection_name": connection.name,
+                "host": connection.ssh_host,
+                "port": connection.ssh_port,
+                "username": connection.ssh_username,
+                "test_output": output,
+                "error": None
+            }
+
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
@@ -520,117 +1023,92 @@ def check_ssh_connection(connection_name: Optional[str] = None) -> Dict[str, Any
                 "test_output": "",
                 "error": error_msg
             }
-    finally:
-        if client:
-            client.close()
 
 @mcp.tool()
-def execute_interactive_command(command: str, input_data: str = "", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
+async def check_ssh_connection(connection_name: Optional[str] = None) -> Dict[str, Any]:
     """
-    执行交互式命令（可以发送输入数据）
-    
+    检查SSH连接状态
+
     Args:
-        command: 要执行的shell命令
-        input_data: 要发送给命令的输入数据
-        timeout: 命令执行超时时间（秒），默认30秒
         connection_name: SSH连接名称，如果不指定则使用默认连接
-    
+
     Returns:
-        Dict包含执行结果（同execute_command）
+        Dict包含连接状态信息：
+        - connected: 是否能够连接
+        - connection_name: 连接名称
+        - host: 目标主机
+        - port: 目标端口
+        - username: 用户名
+        - error: 错误信息（如果有）
     """
-    client = None
+    return await asyncio.to_thread(_check_ssh_connection_sync, connection_name)
+
+def _execute_interactive_command_sync(command: str, input_data: str = "", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """execute_interactive_command 的同步实现，在工作线程中运行"""
     try:
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 执行命令
-        stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-        
-        # 如果有输入数据，发送给命令
-        if input_data:
-            stdin.write(input_data)
-            stdin.flush()
-        
-        # 关闭stdin以表示输入结束
-        stdin.close()
-        
-        # 等待命令完成并获取结果
-        exit_code = stdout.channel.recv_exit_status()
-        stdout_data = stdout.read().decode('utf-8', errors='replace')
-        stderr_data = stderr.read().decode('utf-8', errors='replace')
-        
-        result = {
-            "success": exit_code == 0,
-            "exit_code": exit_code,
-            "stdout": stdout_data,
-            "stderr": stderr_data,
-            "error": None,
-            "connection": connection.name
-        }
-        
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            # 执行命令
+            stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+
+            # 如果有输入数据，发送给命令
+            if input_data:
+                stdin.write(input_data)
+                stdin.flush()
+
+            # 关闭stdin以表示输入结束
+            stdin.close()
+
+            # 并发排空两个输出流，避免大输出时与退出状态互相阻塞
+            exit_code, stdout_data, stderr_data = _drain_exec_channel(stdout.channel, timeout=timeout)
+
+            result = {
+                "success": exit_code == 0,
+                "exit_code": exit_code,
+                "stdout": stdout_data,
+                "stderr": stderr_data,
+                "error": None,
+                "connection": connection.name
+            }
+
         logger.info(f"交互式命令执行完成 [{connection.name}]: '{command}', 退出码: {exit_code}")
         log_manager.save_execution_log(command, result)
         return result
-        
+
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
     except Exception as e:
         error_msg = f"交互式命令执行失败: {str(e)}"
         logger.error(error_msg)
-        result = {
-            "success": False,
-            "exit_code": -1,
-            "stdout": "",
-            "stderr": "",
-            "error": error_msg,
-            "connection": connection_name
-        }
+        result = _command_failure(error_msg, connection_name)
         log_manager.save_execution_log(command, result)
         return result
-    finally:
-        if client:
-            client.close()
 
 @mcp.tool()
-def upload_file(local_path: str, remote_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
+async def execute_interactive_command(command: str, input_data: str = "", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
     """
-    使用SFTP协议上传文件到远程服务器
-    
+    执行交互式命令（可以发送输入数据）
+
     Args:
-        local_path: 本地文件路径
-                   推荐使用绝对路径以避免路径解析问题
-                   如果使用相对路径，将基于MCP服务器的工作目录进行解析
-        remote_path: 远程服务器文件路径（绝对路径）
-        timeout: 传输超时时间（秒），默认60秒
+        command: 要执行的shell命令
+        input_data: 要发送给命令的输入数据
+        timeout: 命令执行超时时间（秒），默认30秒
         connection_name: SSH连接名称，如果不指定则使用默认连接
-    
+
     Returns:
-        Dict包含上传结果：
-        - success: 是否成功上传
-        - local_path: 本地文件路径（转换为绝对路径后）
-        - remote_path: 远程文件路径
-        - file_size: 文件大小（字节）
-        - connection: 使用的连接名称
-        - error: 错误信息（如果有）
+        Dict包含执行结果（同execute_command）
     """
-    client = None
-    sftp = None
+    return await asyncio.to_thread(_execute_interactive_command_sync, command, input_data, timeout, connection_name)
+
+def _upload_file_sync(local_path: str, remote_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """upload_file 的同步实现，在工作线程中运行"""
     try:
         # 将本地路径转换为绝对路径，提高兼容性
         local_path = os.path.abspath(local_path)
-        
+
         # 检查本地文件是否存在
         if not os.path.exists(local_path):
             error_msg = f"本地文件不存在: {local_path} (已转换为绝对路径，请确认文件路径是否正确)"
@@ -643,387 +1121,283 @@ def upload_file(local_path: str, remote_path: str, timeout: int = 60, connection
                 "connection": connection_name,
                 "error": error_msg
             }
-        
+
         # 获取文件大小
         file_size = os.path.getsize(local_path)
-        
-        # 建立SSH连接
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 创建SFTP客户端
-        sftp = client.open_sftp()
-        
-        # 设置超时
-        sftp.get_channel().settimeout(timeout)
-        
-        # 确保远程目录存在
-        remote_dir = os.path.dirname(remote_path)
-        if remote_dir:
+
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            sftp = None
             try:
-                # 尝试创建远程目录（如果不存在）
-                stdin, stdout, stderr = client.exec_command(f'mkdir -p "{remote_dir}"')
-                stdout.channel.recv_exit_status()  # 等待命令完成
-            except Exception as e:
-                logger.warning(f"创建远程目录时出现警告: {e}")
-        
-        # 上传文件
-        logger.info(f"开始上传文件 [{connection.name}]: {local_path} -> {remote_path} ({file_size} 字节)")
-        sftp.put(local_path, remote_path)
-        
-        # 验证上传是否成功
-        try:
-            remote_stat = sftp.stat(remote_path)
-            if remote_stat.st_size == file_size:
-                logger.info(f"文件上传成功 [{connection.name}]: {local_path} -> {remote_path}")
-                return {
-                    "success": True,
-                    "local_path": local_path,
-                    "remote_path": remote_path,
-                    "file_size": file_size,
-                    "connection": connection.name,
-                    "error": None
-                }
-            else:
-                error_msg = f"文件上传验证失败: 远程文件大小({remote_stat.st_size})与本地文件大小({file_size})不匹配"
-                logger.error(error_msg)
-                return {
-                    "success": False,
-                    "local_path": local_path,
-                    "remote_path": remote_path,
-                    "file_size": file_size,
-                    "connection": connection.name,
-                    "error": error_msg
-                }
-        except Exception as e:
-            error_msg = f"无法验证远程文件: {str(e)}"
-            logger.warning(error_msg)
-            # 即使验证失败，我们仍然认为上传可能成功了
-            return {
-                "success": True,
-                "local_path": local_path,
-                "remote_path": remote_path,
-                "file_size": file_size,
-                "connection": connection.name,
-                "error": f"上传完成但验证失败: {error_msg}"
-            }
-        
+                # 创建SFTP客户端（调优窗口/包大小）
+                sftp = _open_tuned_sftp(client)
+
+                # 设置超时
+                sftp.get_channel().settimeout(timeout)
+
+                # 确保远程目录存在（仅在缺失时创建，避免额外的SSH通道往返）
+                remote_dir = os.path.dirname(remote_path)
+                if remote_dir:
+                    try:
+                        _ensure_remote_dir(sftp, remote_dir)
+                    except Exception as e:
+                        logger.warning(f"创建远程目录时出现警告: {e}")
+
+                # 分块流水线上传：set_pipelined 让写请求不必逐个等待ACK
+                logger.info(f"开始上传文件 [{connection.name}]: {local_path} -> {remote_path} ({file_size} 字节)")
+                with open(local_path, 'rb') as local_file:
+                    with sftp.file(remote_path, 'wb') as remote_file:
+                        remote_file.set_pipelined(True)
+                        while True:
+                            chunk = local_file.read(SFTP_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            remote_file.write(chunk)
+
+                # 验证上传是否成功
+                try:
+                    remote_stat = sftp.stat(remote_path)
+                    if remote_stat.st_size == file_size:
+                        logger.info(f"文件上传成功 [{connection.name}]: {local_path} -> {remote_path}")
+                        return {
+                            "success": True,
+                            "local_path": local_path,
+                            "remote_path": remote_path,
+                            "file_size": file_size,
+                            "connection": connection.name,
+                            "error": None
+                        }
+                    else:
+                        error_msg = f"文件上传验证失败: 远程文件大小({remote_stat.st_size})与本地文件大小({file_size})不匹配"
+                        logger.error(error_msg)
+                        return {
+                            "success": False,
+                            "local_path": local_path,
+                            "remote_path": remote_path,
+                            "file_size": file_size,
+                            "connection": connection.name,
+                            "error": error_msg
+                        }
+                except Exception as e:
+                    error_msg = f"无法验证远程文件: {str(e)}"
+                    logger.warning(error_msg)
+                    # 即使验证失败，我们仍然认为上传可能成功了
+                    return {
+                        "success": True,
+                        "local_path": local_path,
+                        "remote_path": remote_path,
+                        "file_size": file_size,
+                        "connection": connection.name,
+                        "error": f"上传完成但验证失败: {error_msg}"
+                    }
+            finally:
+                if sftp:
+                    sftp.close()
+
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
     except paramiko.AuthenticationException:
         error_msg = "SSH认证失败，请检查用户名和密码/密钥"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
     except paramiko.SSHException as e:
         error_msg = f"SSH连接错误: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
     except FileNotFoundError:
         error_msg = f"本地文件未找到: {local_path} (请确认使用正确的绝对路径)"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
     except PermissionError:
         error_msg = f"权限错误: 无法访问本地文件 {local_path} 或远程路径 {remote_path}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
     except Exception as e:
         error_msg = f"文件上传失败: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "local_path": local_path,
-            "remote_path": remote_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
-    finally:
-        if sftp:
-            sftp.close()
-        if client:
-            client.close()
+        return _upload_failure(local_path, remote_path, connection_name, error_msg)
 
 @mcp.tool()
-def download_file(remote_path: str, local_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
+async def upload_file(local_path: str, remote_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
     """
-    使用SFTP协议从远程服务器下载文件到本地
-    
+    使用SFTP协议上传文件到远程服务器
+
     Args:
-        remote_path: 远程服务器文件路径（绝对路径）
-        local_path: 本地文件保存路径
+        local_path: 本地文件路径
                    推荐使用绝对路径以避免路径解析问题
                    如果使用相对路径，将基于MCP服务器的工作目录进行解析
+        remote_path: 远程服务器文件路径（绝对路径）
         timeout: 传输超时时间（秒），默认60秒
         connection_name: SSH连接名称，如果不指定则使用默认连接
-    
+
     Returns:
-        Dict包含下载结果：
-        - success: 是否成功下载
-        - remote_path: 远程文件路径
+        Dict包含上传结果：
+        - success: 是否成功上传
         - local_path: 本地文件路径（转换为绝对路径后）
+        - remote_path: 远程文件路径
         - file_size: 文件大小（字节）
         - connection: 使用的连接名称
         - error: 错误信息（如果有）
     """
-    client = None
-    sftp = None
+    return await asyncio.to_thread(_upload_file_sync, local_path, remote_path, timeout, connection_name)
+
+def _download_file_sync(remote_path: str, local_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """download_file 的同步实现，在工作线程中运行"""
     try:
         # 将本地路径转换为绝对路径，提高兼容性
         local_path = os.path.abspath(local_path)
-        
-        # 建立SSH连接
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 创建SFTP客户端
-        sftp = client.open_sftp()
-        
-        # 设置超时
-        sftp.get_channel().settimeout(timeout)
-        
-        # 检查远程文件是否存在
-        try:
-            remote_stat = sftp.stat(remote_path)
-            file_size = remote_stat.st_size
-        except FileNotFoundError:
-            error_msg = f"远程文件不存在: {remote_path}"
-            logger.error(error_msg)
-            return {
-                "success": False,
-                "remote_path": remote_path,
-                "local_path": local_path,
-                "file_size": 0,
-                "connection": connection.name,
-                "error": error_msg
-            }
-        
-        # 确保本地目录存在
-        local_dir = os.path.dirname(local_path)
-        if local_dir and not os.path.exists(local_dir):
+
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            sftp = None
             try:
-                os.makedirs(local_dir, exist_ok=True)
-                logger.info(f"创建本地目录: {local_dir}")
-            except Exception as e:
-                error_msg = f"创建本地目录失败: {e}"
-                logger.error(error_msg)
-                return {
-                    "success": False,
-                    "remote_path": remote_path,
-                    "local_path": local_path,
-                    "file_size": 0,
-                    "connection": connection.name,
-                    "error": error_msg
-                }
-        
-        # 下载文件
-        logger.info(f"开始下载文件 [{connection.name}]: {remote_path} -> {local_path} ({file_size} 字节)")
-        sftp.get(remote_path, local_path)
-        
-        # 验证下载是否成功
-        if os.path.exists(local_path):
-            local_size = os.path.getsize(local_path)
-            if local_size == file_size:
-                logger.info(f"文件下载成功 [{connection.name}]: {remote_path} -> {local_path}")
-                return {
-                    "success": True,
-                    "remote_path": remote_path,
-                    "local_path": local_path,
-                    "file_size": file_size,
-                    "connection": connection.name,
-                    "error": None
-                }
-            else:
-                error_msg = f"文件下载验证失败: 本地文件大小({local_size})与远程文件大小({file_size})不匹配"
-                logger.error(error_msg)
-                return {
-                    "success": False,
-                    "remote_path": remote_path,
-                    "local_path": local_path,
-                    "file_size": file_size,
-                    "connection": connection.name,
-                    "error": error_msg
-                }
-        else:
-            error_msg = "下载后本地文件不存在"
-            logger.error(error_msg)
-            return {
-                "success": False,
-                "remote_path": remote_path,
-                "local_path": local_path,
-                "file_size": file_size,
-                "connection": connection.name,
-                "error": error_msg
-            }
-        
+                # 创建SFTP客户端
+                sftp = client.open_sftp()
+
+                # 设置超时
+                sftp.get_channel().settimeout(timeout)
+
+                # 检查远程文件是否存在
+                try:
+                    remote_stat = sftp.stat(remote_path)
+                    file_size = remote_stat.st_size
+                except FileNotFoundError:
+                    error_msg = f"远程文件不存在: {remote_path}"
+                    logger.error(error_msg)
+                    return _download_failure(remote_path, local_path, connection.name, error_msg)
+
+                # 确保本地目录存在
+                local_dir = os.path.dirname(local_path)
+                if local_dir and not os.path.exists(local_dir):
+                    try:
+                        os.makedirs(local_dir, exist_ok=True)
+                        logger.info(f"创建本地目录: {local_dir}")
+                    except Exception as e:
+                        error_msg = f"创建本地目录失败: {e}"
+                        logger.error(error_msg)
+                        return {
+                            "success": False,
+                            "remote_path": remote_path,
+                            "local_path": local_path,
+                            "file_size": 0,
+                            "connection": connection.name,
+                            "error": error_msg
+                        }
+
+                # 下载文件
+                logger.info(f"开始下载文件 [{connection.name}]: {remote_path} -> {local_path} ({file_size} 字节)")
+                sftp.get(remote_path, local_path)
+
+                # 验证下载是否成功
+                if os.path.exists(local_path):
+                    local_size = os.path.getsize(local_path)
+                    if local_size == file_size:
+                        logger.info(f"文件下载成功 [{connection.name}]: {remote_path} -> {local_path}")
+                        return {
+                            "success": True,
+                            "remote_path": remote_path,
+                            "local_path": local_path,
+                            "file_size": file_size,
+                            "connection": connection.name,
+                            "error": None
+                        }
+                    else:
+                        error_msg = f"文件下载验证失败: 本地文件大小({local_size})与远程文件大小({file_size})不匹配"
+                        logger.error(error_msg)
+                        return {
+                            "success": False,
+                            "remote_path": remote_path,
+                            "local_path": local_path,
+                            "file_size": file_size,
+                            "connection": connection.name,
+                            "error": error_msg
+                        }
+                else:
+                    error_msg = "下载后本地文件不存在"
+                    logger.error(error_msg)
+                    return {
+                        "success": False,
+                        "remote_path": remote_path,
+                        "local_path": local_path,
+                        "file_size": file_size,
+                        "connection": connection.name,
+                        "error": error_msg
+                    }
+            finally:
+                if sftp:
+                    sftp.close()
+
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
-        return {
-            "success": False,
-            "remote_path": remote_path,
-            "local_path": local_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _download_failure(remote_path, local_path, connection_name, error_msg)
     except paramiko.AuthenticationException:
         error_msg = "SSH认证失败，请检查用户名和密码/密钥"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "remote_path": remote_path,
-            "local_path": local_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _download_failure(remote_path, local_path, connection_name, error_msg)
     except paramiko.SSHException as e:
         error_msg = f"SSH连接错误: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "remote_path": remote_path,
-            "local_path": local_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _download_failure(remote_path, local_path, connection_name, error_msg)
     except PermissionError:
         error_msg = f"权限错误: 无法访问远程文件 {remote_path} 或本地路径 {local_path}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "remote_path": remote_path,
-            "local_path": local_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _download_failure(remote_path, local_path, connection_name, error_msg)
     except Exception as e:
         error_msg = f"文件下载失败: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "remote_path": remote_path,
-            "local_path": local_path,
-            "file_size": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
-    finally:
-        if sftp:
-            sftp.close()
-        if client:
-            client.close()
+        return _download_failure(remote_path, local_path, connection_name, error_msg)
 
 @mcp.tool()
-def list_directory(remote_path: str = ".", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
+async def download_file(remote_path: str, local_path: str, timeout: int = 60, connection_name: Optional[str] = None) -> Dict[str, Any]:
     """
-    获取远程目录的结构化文件列表
-    
+    使用SFTP协议从远程服务器下载文件到本地
+
     Args:
-        remote_path: 远程目录路径，默认为当前目录 "."
-        timeout: 操作超时时间（秒），默认30秒
+        remote_path: 远程服务器文件路径（绝对路径）
+        local_path: 本地文件保存路径
+                   推荐使用绝对路径以避免路径解析问题
+                   如果使用相对路径，将基于MCP服务器的工作目录进行解析
+        timeout: 传输超时时间（秒），默认60秒
         connection_name: SSH连接名称，如果不指定则使用默认连接
-    
+
     Returns:
-        Dict包含目录列表结果：
-        - success: 是否成功获取
-        - path: 目录路径
-        - files: 文件列表，每个文件包含：
-            - name: 文件名
-            - type: 类型 (file/directory/symlink/other)
-            - size: 文件大小（字节，仅文件类型）
-            - permissions: 权限字符串（如 "rwxr-xr-x"）
-            - modified_time: 修改时间（Unix时间戳）
-            - owner_uid: 所有者UID
-            - group_gid: 组GID
-        - total_count: 文件总数
+        Dict包含下载结果：
+        - success: 是否成功下载
+        - remote_path: 远程文件路径
+        - local_path: 本地文件路径（转换为绝对路径后）
+        - file_size: 文件大小（字节）
         - connection: 使用的连接名称
         - error: 错误信息（如果有）
     """
-    client = None
+    return await asyncio.to_thread(_download_file_sync, remote_path, local_path, timeout, connection_name)
+
+def _list_directory_sync(remote_path: str = ".", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """list_directory 的同步实现，在工作线程中运行"""
     sftp = None
     try:
-        # 建立SSH连接
-        connection = ssh_manager.get_connection(connection_name)
-        client = connection.create_client()
-        connection.connect(client)
-        
-        # 创建SFTP客户端
-        sftp = client.open_sftp()
-        
-        # 设置超时
-        sftp.get_channel().settimeout(timeout)
-        
-        # 获取目录列表
-        logger.info(f"获取目录列表 [{connection.name}]: {remote_path}")
-        
-        try:
-            # 列出目录内容
-            file_attrs = sftp.listdir_attr(remote_path)
-        except FileNotFoundError:
-            error_msg = f"远程目录不存在: {remote_path}"
-            logger.error(error_msg)
-            return {
-                "success": False,
-                "path": remote_path,
-                "files": [],
-                "total_count": 0,
-                "connection": connection.name,
-                "error": error_msg
-            }
-        except PermissionError:
-            error_msg = f"权限不足，无法访问目录: {remote_path}"
-            logger.error(error_msg)
-            return {
-                "success": False,
-                "path": remote_path,
-                "files": [],
-                "total_count": 0,
-                "connection": connection.name,
-                "error": error_msg
-            }
-        
+        with ssh_pool.borrow(connection_name) as (connection, client):
+            # 创建SFTP客户端
+            sftp = client.open_sftp()
+
+            # 设置超时
+            sftp.get_channel().settimeout(timeout)
+
+            # 获取目录列表
+            logger.info(f"获取目录列表 [{connection.name}]: {remote_path}")
+
+            try:
+                # 列出目录内容
+                file_attrs = sftp.listdir_attr(remote_path)
+            except FileNotFoundError:
+                error_msg = f"远程目录不存在: {remote_path}"
+                logger.error(error_msg)
+                return _listing_failure(remote_path, connection.name, error_msg)
+            except PermissionError:
+                error_msg = f"权限不足，无法访问目录: {remote_path}"
+                logger.error(error_msg)
+                return _listing_failure(remote_path, connection.name, error_msg)
+
         # 解析文件属性
         files = []
         for attr in file_attrs:
@@ -1084,52 +1458,62 @@ def list_directory(remote_path: str = ".", timeout: int = 30, connection_name: O
     except ValueError as e:
         error_msg = str(e)
         logger.error(error_msg)
-        return {
-            "success": False,
-            "path": remote_path,
-            "files": [],
-            "total_count": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _listing_failure(remote_path, connection_name, error_msg)
     except paramiko.AuthenticationException:
         error_msg = "SSH认证失败，请检查用户名和密码/密钥"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "path": remote_path,
-            "files": [],
-            "total_count": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _listing_failure(remote_path, connection_name, error_msg)
     except paramiko.SSHException as e:
         error_msg = f"SSH连接错误: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "path": remote_path,
-            "files": [],
-            "total_count": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _listing_failure(remote_path, connection_name, error_msg)
     except Exception as e:
         error_msg = f"获取目录列表失败: {str(e)}"
         logger.error(error_msg)
-        return {
-            "success": False,
-            "path": remote_path,
-            "files": [],
-            "total_count": 0,
-            "connection": connection_name,
-            "error": error_msg
-        }
+        return _listing_failure(remote_path, connection_name, error_msg)
     finally:
         if sftp:
             sftp.close()
-        if client:
-            client.close()
+
+@mcp.tool()
+async def list_directory(remote_path: str = ".", timeout: int = 30, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    获取远程目录的结构化文件列表
+
+    Args:
+        remote_path: 远程目录路径，默认为当前目录 "."
+        timeout: 操作超时时间（秒），默认30秒
+        connection_name: SSH连接名称，如果不指定则使用默认连接
+
+    Returns:
+        Dict包含目录列表结果：
+        - success: 是否成功获取
+        - path: 目录路径
+        - files: 文件列表，每个文件包含：
+            - name: 文件名
+            - type: 类型 (file/directory/symlink/other)
+            - size: 文件大小（字节，仅文件类型）
+            - permissions: 权限字符串（如 "rwxr-xr-x"）
+            - modified_time: 修改时间（Unix时间戳）
+            - owner_uid: 所有者UID
+            - group_gid: 组GID
+        - total_count: 文件总数
+        - connection: 使用的连接名称
+        - error: 错误信息（如果有）
+    """
+    return await asyncio.to_thread(_list_directory_sync, remote_path, timeout, connection_name)
+
+def _warm_default_connection():
+    """预热默认连接并记录连通性结果
+
+    在后台daemon线程中运行：通过连接池做一次探测，成功建立的连接
+    会留在池中供首次工具调用复用，避免冷启动握手落在用户请求上。
+    """
+    result = _check_ssh_connection_sync()
+    if result["connected"]:
+        logger.info(f"默认连接预热成功: {result['connection_name']}")
+    else:
+        logger.warning(f"默认连接预热失败: {result['error']}")
 
 def main():
     """主函数入口点"""
@@ -1143,14 +1527,10 @@ def main():
             for name, info in connections_info["connections"].items():
                 logger.info(f"  - {name}: {info['username']}@{info['host']}:{info['port']} ({info['auth_method']})")
             logger.info(f"默认连接: {connections_info['default_connection']}")
-            
-            # 测试默认连接
-            logger.info("正在测试默认连接...")
-            test_result = check_ssh_connection()
-            if test_result["connected"]:
-                logger.info(f"默认连接测试成功: {test_result['connection_name']}")
-            else:
-                logger.warning(f"默认连接测试失败: {test_result['error']}")
+            # 在后台线程预热默认连接：不阻塞服务器启动，同时探测
+            # 经过连接池，建立的连接会被保留下来，首次工具调用直接
+            # 命中热连接；连通性结果仍会记录到启动日志
+            threading.Thread(target=_warm_default_connection, daemon=True).start()
         else:
             logger.warning("未找到任何SSH连接配置，服务器将以受限模式启动")
         
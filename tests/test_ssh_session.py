@@ -0,0 +1,133 @@
+"""SSHSession 共享shell框架的回归测试
+
+不依赖网络：用本地PTY上的bash模拟远端交互式shell，验证哨兵切分、
+退出码解析和输出清理在真实PTY行为（回显、提示符、转义序列）下的正确性。
+"""
+import os
+import pty
+import select
+import shutil
+import socket
+import subprocess
+
+import pytest
+
+from ssh_mcp_server.server import SSHSession
+
+pytestmark = pytest.mark.skipif(shutil.which('bash') is None, reason="需要本地bash")
+
+
+class FakeTransport:
+    """始终活跃的Transport替身"""
+
+    def is_active(self):
+        return True
+
+
+class FakeChannel:
+    """用 PTY + 交互式bash 模拟 paramiko.Channel"""
+
+    def __init__(self):
+        self.master_fd, slave_fd = pty.openpty()
+        self.proc = subprocess.Popen(
+            ['bash', '--norc', '--noprofile', '-i'],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            start_new_session=True,
+            close_fds=True,
+        )
+        os.close(slave_fd)
+        self.closed = False
+        self._timeout = None
+
+    def settimeout(self, timeout):
+        self._timeout = timeout
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return os.write(self.master_fd, data)
+
+    def recv(self, size):
+        readable, _, _ = select.select([self.master_fd], [], [], self._timeout)
+        if not readable:
+            raise socket.timeout("等待PTY输出超时")
+        return os.read(self.master_fd, size)
+
+    def recv_ready(self):
+        readable, _, _ = select.select([self.master_fd], [], [], 0)
+        return bool(readable)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            # 交互式bash会忽略SIGTERM，直接kill
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+            os.close(self.master_fd)
+
+
+class FakeClient:
+    """只实现 SSHSession 所需接口的 SSHClient 替身"""
+
+    def __init__(self):
+        self.channel = FakeChannel()
+        self.transport = FakeTransport()
+
+    def invoke_shell(self, width=80, height=24):
+        return self.channel
+
+    def get_transport(self):
+        return self.transport
+
+
+@pytest.fixture
+def session():
+    client = FakeClient()
+    shell = SSHSession(client)
+    yield shell
+    client.channel.close()
+
+
+def test_first_command_not_polluted_by_init_echo(session):
+    """初始化命令的回显不能触发哨兵匹配，首条命令必须拿到自己的输出"""
+    output, exit_code = session.run("echo hello")
+    assert exit_code == 0
+    assert output.strip() == "hello"
+
+
+def test_output_and_exit_code_stay_in_sync_across_commands(session):
+    """连续命令的输出和退出码不能错位到上一条命令"""
+    out1, code1 = session.run("echo first")
+    out2, code2 = session.run("echo second; false")
+    out3, code3 = session.run("true")
+    assert (out1.strip(), code1) == ("first", 0)
+    assert (out2.strip(), code2) == ("second", 1)
+    assert (out3.strip(), code3) == ("", 0)
+
+
+def test_nonzero_exit_code_reported(session):
+    output, exit_code = session.run("sh -c 'exit 7'")
+    assert exit_code == 7
+
+
+def test_multiline_output(session):
+    output, exit_code = session.run("printf 'a\\nb\\nc\\n'")
+    assert exit_code == 0
+    assert output.strip().splitlines() == ["a", "b", "c"]
+
+
+def test_no_terminal_escape_sequences_in_output(session):
+    """bracketed paste等PTY转义序列不能泄漏进命令输出"""
+    out1, _ = session.run("echo plain")
+    out2, _ = session.run("echo again")
+    assert '\x1b' not in out1
+    assert '\x1b' not in out2
+
+
+def test_trailing_comment_does_not_swallow_sentinel(session):
+    """命令末尾的 # 注释不能吞掉哨兵printf导致超时"""
+    output, exit_code = session.run("echo ok  # trailing comment")
+    assert (output.strip(), exit_code) == ("ok", 0)
+